@@ -2,17 +2,64 @@
 from typing import Dict, List, Optional, Any
 
 class TrieNode:
+    # בלי __dict__ לכל צומת — חוסך זיכרון ומאיץ גישה לשדות בלולאות החמות
+    __slots__ = ("children", "extra", "is_end_of_word", "word_text",
+                 "word_object", "prefix_count")
+
     def __init__(self):
-        self.children: Dict[str, "TrieNode"] = {}
+        # מערך של 26 תאים במקום dict — אינדוקס ישיר לפי ord(ch)-97 בלי hashing
+        self.children: List[Optional["TrieNode"]] = [None] * 26
+        self.extra: Optional[Dict[str, "TrieNode"]] = None  # תווים נדירים מחוץ ל-a-z
         self.is_end_of_word: bool = False
         # נשמור גם טקסט וגם אובייקט, כדי לתמוך בשתי הגרסאות (pygame/web)
         self.word_text: Optional[str] = None
         self.word_object: Optional[Any] = None#אוביט חי שנמצא על המסך כרגע,מילה שנמצאת על המסך כרגע
         self.prefix_count: int = 0
 
+    def get(self, ch: str) -> Optional["TrieNode"]:
+        idx = ord(ch) - 97
+        if 0 <= idx < 26:
+            return self.children[idx]
+        return self.extra.get(ch) if self.extra else None
+
+    def get_or_create(self, ch: str) -> "TrieNode":
+        idx = ord(ch) - 97
+        if 0 <= idx < 26:
+            node = self.children[idx]
+            if node is None:
+                node = self.children[idx] = TrieNode()
+            return node
+        if self.extra is None:
+            self.extra = {}
+        node = self.extra.get(ch)
+        if node is None:
+            node = self.extra[ch] = TrieNode()
+        return node
+
+    def delete(self, ch: str):
+        idx = ord(ch) - 97
+        if 0 <= idx < 26:
+            self.children[idx] = None
+        elif self.extra:
+            self.extra.pop(ch, None)
+
+    def iter_children(self):
+        for i, node in enumerate(self.children):
+            if node is not None:
+                yield chr(97 + i), node
+        if self.extra:
+            yield from self.extra.items()
+
+    def has_children(self) -> bool:
+        return any(c is not None for c in self.children) or bool(self.extra)
+
 class Trie:
+    __slots__ = ("root", "_live_words")
+
     def __init__(self):
         self.root = TrieNode()
+        # רשימה שטוחה של אובייקטים חיים — שאילתות לפי y לא צריכות את מבנה ה-Trie
+        self._live_words: List[Any] = []
 
     def insert(self, word_obj: Any):
         """
@@ -24,44 +71,50 @@ class Trie:
 
         node = self.root
         for ch in word_text.lower():
-            if ch not in node.children:
-                node.children[ch] = TrieNode()
-            node = node.children[ch]
+            node = node.get_or_create(ch)
             node.prefix_count += 1
         node.is_end_of_word = True
         node.word_text = word_text
-        # נשמור אובייקט רק אם באמת יש .text 
+        # נשמור אובייקט רק אם באמת יש .text
         node.word_object = word_obj if hasattr(word_obj, "text") else None
+        if node.word_object is not None:
+            self._live_words.append(node.word_object)
 
     def remove(self, word: str):
         word = word.lower()
         path = []
         node = self.root
         for ch in word:
-            if ch not in node.children:
+            child = node.get(ch)
+            if child is None:
                 return
             path.append((node, ch))
-            node = node.children[ch]
+            node = child
         if not node.is_end_of_word:
             return
         node.is_end_of_word = False
         node.word_text = None
+        if node.word_object is not None:
+            try:
+                self._live_words.remove(node.word_object)
+            except ValueError:
+                pass
         node.word_object = None
         # עדכון prefix_count וניקוי ענפים ריקים
         for parent, ch in reversed(path):
-            child = parent.children[ch]
+            child = parent.get(ch)
             child.prefix_count -= 1
-            if child.prefix_count <= 0 and not child.is_end_of_word and not child.children:
-                del parent.children[ch]
+            if child.prefix_count <= 0 and not child.is_end_of_word and not child.has_children():
+                parent.delete(ch)
             else:
                 break
 
     def _descend(self, prefix: str) -> Optional[TrieNode]:
         node = self.root
         for ch in prefix.lower():
-            if ch not in node.children:
+            node = node.get(ch)
+            if node is None:
                 return None
-            node = node.children[ch]
         return node
 
     def find_words_starting_with(self, prefix: str) -> List[Any]:
@@ -73,49 +126,57 @@ class Trie:
         return out
 
     def _collect(self, node: TrieNode, out: List[Any]):
-        if node.is_end_of_word:
-            if node.word_object is not None:
-                out.append(node.word_object)
-            elif node.word_text is not None:
-                out.append(node.word_text)
-        for child in node.children.values():
-            self._collect(child, out)
+        # מחסנית מפורשת במקום רקורסיה — בלי frame לכל צומת ובלי מגבלת עומק
+        stack = [node]
+        pop = stack.pop
+        push = stack.extend
+        append = out.append
+        while stack:
+            n = pop()
+            if n.is_end_of_word:
+                if n.word_object is not None:
+                    append(n.word_object)
+                elif n.word_text is not None:
+                    append(n.word_text)
+            push(c for c in n.children if c is not None)
+            if n.extra:
+                push(n.extra.values())
 
     def find_best_match(self, typed_prefix: str):
         matches = self.find_words_starting_with(typed_prefix)
         if not matches:
             return None
-        try:
-            return sorted(
-                [m for m in matches if hasattr(m, "position")],
-                key=lambda w: w.position[1],
-                reverse=True
-            )[0]
-        except (IndexError, Exception):
-            return matches[0]
+        # מעבר אחד למציאת ה-y המקסימלי במקום מיון של כל ההתאמות
+        best = None
+        best_y = float("-inf")
+        for m in matches:
+            pos = getattr(m, "position", None)
+            try:
+                if pos is not None and pos[1] > best_y:
+                    best_y = pos[1]
+                    best = m
+            except (TypeError, IndexError):
+                continue
+        return best if best is not None else matches[0]
 
     def get_prefix_count(self, first_char: str) -> int:
-        node = self.root.children.get(first_char.lower())
+        node = self.root.get(first_char.lower())
         return node.prefix_count if node else 0
 
     def get_all_prefixes(self) -> Dict[str, int]:
-        return {ch: node.prefix_count for ch, node in self.root.children.items()}
+        return {ch: node.prefix_count for ch, node in self.root.iter_children()}
 
     def find_urgent_words(self, danger_y: int) -> List[Any]:
+        # סינון לינארי על הרשימה השטוחה — אין צורך לרדת בכל ה-Trie בשביל שאילתת y
         urgent: List[Any] = []
-        self._urgent(self.root, urgent, danger_y)
-        if urgent:
-            urgent.sort(key=lambda w: w.position[1], reverse=True)
-        return urgent
-
-    def _urgent(self, node: TrieNode, out: List[Any], danger_y: int):
-        if node.is_end_of_word and node.word_object is not None:
+        for w in self._live_words:
             try:
-                if node.word_object.position[1] >= danger_y:
-                    out.append(node.word_object)
+                if w.position[1] >= danger_y:
+                    urgent.append(w)
             except Exception:
                 pass
-        for child in node.children.values():
-            self._urgent(child, out, danger_y)
+        if urgent:
+            urgent.sort(key=lambda w: w.position[1], reverse=True)
+        return urgent
 
 
@@ -1,6 +1,13 @@
-import os, json, time, random, string, threading
+import os, json, time, random, threading, itertools
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
+
+# ====== NumPy (אופציונלי) ======
+# מערכי SoA לפיזיקת הנפילה; בלי numpy נופלים ללולאה הרגילה.
+try:
+    import numpy as np
+except ImportError:
+    np = None
 from flask import Flask, request, send_from_directory, session, jsonify, render_template
 from flask_socketio import SocketIO, emit, join_room, leave_room
 
@@ -31,54 +38,85 @@ SCORE_PER_CHAR = 5
 WORD_BONUS = 10
 STREAK_BONUS = 4
 MISS_LIFE_PENALTY = 1
-PLAYER_COLORS = [(255,120,120),(120,120,255)]
+# צבעים כרשימות (ולא tuples) כדי שהסריאליזציה לא תמיר בכל שליחה
+PLAYER_COLORS = [[255,120,120],[120,120,255]]
 WORD_BANK_PATHS = ["./assets/wordcache_en.json", "./wordcache_en.json"]
+MAX_WORDS = 256  # גודל התחלתי של מערכי ה-SoA; גדלים לפי הצורך
+
+# קודי סטטוס במערך ה-SoA
+ST_DEAD, ST_FALLING, ST_LOCKED = 0, 1, 2
+
+# ====== JSON מהיר (אופציונלי) ======
+# orjson מסריאל ישירות ל-bytes — המסלול הכבד הוא snapshot() שנשלח 30 פעמים בשנייה.
+try:
+    import orjson
+    class _FastJSON:
+        @staticmethod
+        def dumps(obj, **kwargs):
+            return orjson.dumps(obj).decode("utf-8")
+        @staticmethod
+        def loads(s, **kwargs):
+            return orjson.loads(s)
+    SOCKETIO_JSON = _FastJSON
+except ImportError:
+    SOCKETIO_JSON = json
 
 # ====== Flask + SocketIO ======
 app = Flask(__name__, static_folder=".", template_folder="templates")
 app.config["SECRET_KEY"] = "space-typing-secret"
-socketio = SocketIO(app, cors_allowed_origins="*", supports_credentials=True)
+socketio = SocketIO(app, cors_allowed_origins="*", supports_credentials=True, json=SOCKETIO_JSON)
 
 # ====== טעינת מאגר מילים ======
+DEFAULT_WORDS = ["space","typing","galaxy","planet","rocket","comet","meteor","python","socket","vector","engine"]
+
 def load_word_bank() -> List[str]:
-    words: List[str] = []
+    raw = None
     for p in WORD_BANK_PATHS:
         if os.path.exists(p):
             try:
                 data = json.load(open(p, "r", encoding="utf-8"))
-                if isinstance(data, list):
-                    words = data
-                elif isinstance(data, dict) and "words" in data:
-                    words = data["words"]
-                elif isinstance(data, dict) and "buckets" in data:
-                    # טיפול בפורמט buckets של wordcache_en.json
-                    words = []
-                    for bucket_words in data["buckets"].values():
-                        if isinstance(bucket_words, list):
-                            words.extend(bucket_words)
-                break
             except Exception:
-                pass
-    if not words:
-        words = ["space","typing","galaxy","planet","rocket","comet","meteor","python","socket","vector","engine"]
-    clean = []
-    seen = set()
-    for w in words:
-        if not isinstance(w, str): continue
-        w = w.strip().lower()
-        if not w or not w.isalpha(): continue
-        if w in seen: continue
-        seen.add(w); clean.append(w)
-    return clean
+                continue
+            if isinstance(data, list):
+                raw = data
+            elif isinstance(data, dict) and "words" in data:
+                raw = data["words"]
+            elif isinstance(data, dict) and "buckets" in data:
+                # פורמט ה-buckets של wordcache_en.json — שרשור עצל בלי רשימת ביניים
+                raw = itertools.chain.from_iterable(
+                    b for b in data["buckets"].values() if isinstance(b, list))
+            break
+    if raw is None:
+        raw = DEFAULT_WORDS
+    # מעבר אחד: ניקוי בגנרטור ודה-דופליקציה ששומרת סדר דרך dict.fromkeys
+    stripped = (w.strip().lower() for w in raw if isinstance(w, str))
+    clean = list(dict.fromkeys(w for w in stripped if w and w.isalpha()))
+    return clean or list(DEFAULT_WORDS)
 
 WORD_BANK = load_word_bank()
 
+# ====== Trie סטטי למאגר המילים ======
+# המאגר קבוע אחרי הטעינה, אז בונים אותו פעם אחת לכל התהליך וכל החדרים חולקים
+# את אותו עותק (המצב הדינמי לכל חדר — מילים נופלות — יושב ב-free_by_first).
+# אם marisa-trie מותקן נשתמש במבנה ה-C הדחוס שלו; אחרת ניפול ל-Trie הרגיל.
+try:
+    import marisa_trie
+    BANK_TRIE = marisa_trie.Trie(WORD_BANK)
+    def bank_words_with_prefix(prefix: str) -> List[str]:
+        return BANK_TRIE.keys(prefix)
+except ImportError:
+    BANK_TRIE = Trie()
+    for _w in WORD_BANK:
+        BANK_TRIE.insert(_w)
+    def bank_words_with_prefix(prefix: str) -> List[str]:
+        return BANK_TRIE.find_words_starting_with(prefix)
+
 # ====== מודלים ======
 @dataclass
 class Player:
     sid: str
     username: str
-    color: Tuple[int,int,int]
+    color: List[int]
     score: int = 0
     lives: int = PLAYER_LIVES
     streak: int = 0
@@ -96,21 +134,26 @@ class Word:
     owner_sid: Optional[str] = None
     typed: str = ""
     remaining: str = ""
-
-    def to_public(self, players: Dict[str, Player]) -> dict:
-        d = {
-            "id": self.id, "text": self.text, "x": self.x, "y": self.y,
-            "typed": self.typed, "remaining": self.remaining, "status": self.status,
-            "claimed_by": self.owner_sid if self.status == "completed" else None,
-            "typing_player": self.owner_sid if self.status in ("locked","completed") else None,
-        }
-        if self.owner_sid and self.owner_sid in players:
-            col = players[self.owner_sid].color
-            d["player_color"] = col
-            d["locked_by_color"] = col
-        else:
-            d["player_color"] = None
-            d["locked_by_color"] = None
+    slot: int = -1  # אינדקס במערכי ה-SoA (כשיש numpy)
+    dirty: bool = False  # השתנה משהו מעבר ל-y מאז הטיק האחרון
+    version: int = 0  # מונה בסגנון seqlock — אי-זוגי בזמן כתיבה מ-type_char
+    public: Optional[dict] = None  # dict מוכן לשליחה — נבנה פעם אחת ומתעדכן במקום
+
+    def to_public(self, color_of_sid: Dict[str, List[int]]) -> dict:
+        d = self.public
+        if d is None:
+            # השדות הקבועים נכתבים פעם אחת בלבד
+            d = self.public = {"id": self.id, "text": self.text, "x": self.x}
+        d["y"] = self.y
+        d["typed"] = self.typed
+        d["remaining"] = self.remaining
+        d["status"] = self.status
+        d["claimed_by"] = self.owner_sid if self.status == "completed" else None
+        d["typing_player"] = self.owner_sid if self.status in ("locked","completed") else None
+        # חיפוש יחיד במפת הצבעים במקום בדיקת קיום + שליפה מ-players
+        col = color_of_sid.get(self.owner_sid) if self.owner_sid else None
+        d["player_color"] = col
+        d["locked_by_color"] = col
         return d
 
 # ====== מחלקת המשחק ======
@@ -118,21 +161,40 @@ class Game:
     def __init__(self, room_id: str, words_list: List[str]):
         self.room_id = room_id
         self.players: Dict[str, Player] = {}
+        # מפת sid -> צבע — מתעדכנת רק כששחקנים מצטרפים, לא בכל emit
+        self._color_of_sid: Dict[str, List[int]] = {}
         self.words: Dict[str, Word] = {}
         self.words_list = words_list
-        self.trie = Trie()
-        for w in self.words_list:
-            if isinstance(w, str) and w.isalpha():
-                self.trie.insert(w)
+        self.trie = BANK_TRIE  # מבנה משותף לקריאה בלבד — אין צורך לבנות מחדש לכל חדר
         self.running = False
-        self.lock = threading.Lock()
+        # נעילות מפוצלות: _word_lock על מילים/אינדקסים, _player_lock על ניקוד/חיים.
+        # סדר קבוע למניעת deadlock: תמיד _word_lock ואז _player_lock.
+        self._word_lock = threading.Lock()
+        self._player_lock = threading.Lock()
         self.rng = random.Random(time.time()+hash(room_id))
+        self._next_wid = 0  # מונה רץ למזהי מילים — בלי שעון ובלי התנגשויות
         self.active_texts: set[str] = set()
-        self.used_words: set[str] = set()  # מילים שכבר הופיעו במשחק
-        self.next_spawn_time = time.time() + self.rng.uniform(SPAWN_EVERY_MIN, SPAWN_EVERY_MAX)
+        # מאגר מעורבב — pop מהסוף נותן מילה ייחודית אקראית ב-O(1)
+        self._available = list(self.words_list)
+        self.rng.shuffle(self._available)
+        self.free_by_first: Dict[str, set] = {}  # אות ראשונה -> מזהי מילים חופשיות
+        # מערכי SoA: y/מהירות/סטטוס בכל המילים, מאונדקסים לפי slot
+        if np is not None:
+            self._y = np.zeros(MAX_WORDS, np.float32)
+            self._speed = np.zeros(MAX_WORDS, np.float32)
+            self._status = np.zeros(MAX_WORDS, np.int8)
+            self._id_of_slot: List[Optional[str]] = [None] * MAX_WORDS
+            self._free_slots = list(range(MAX_WORDS - 1, -1, -1))
+        # שעון מונוטוני — לא מושפע מקפיצות בשעון הקיר
+        self.next_spawn_time = time.monotonic() + self.rng.uniform(SPAWN_EVERY_MIN, SPAWN_EVERY_MAX)
+        # מטמון של public_players — נבנה מחדש רק כשניקוד/חיים משתנים
+        self._pub_cache: Optional[dict] = None
+        self._pub_dirty = True
 
     def public_players(self):
         """מחזיר את המידע הציבורי של השחקנים - כל שחקן רואה את הניקוד שלו ואת הניקוד של היריב"""
+        if not self._pub_dirty and self._pub_cache is not None:
+            return self._pub_cache
         result = {}
         player_sids = list(self.players.keys())
         
@@ -150,122 +212,219 @@ class Game:
                 "my_score": p.score,  # הניקוד שלי
                 "opponent_score": opponent_score   # הניקוד של היריב
             }
-        
+
+        self._pub_cache = result
+        self._pub_dirty = False
         return result
 
     def snapshot(self):
-        return [w.to_public(self.players) for w in self.words.values()]
+        # רק y משתנה בין טיקים — שאר השדות מתעדכנים במקום דרך to_public
+        self._sync_positions()
+        out = []
+        for w in self.words.values():
+            if w.public is None:
+                w.to_public(self._color_of_sid)
+            else:
+                w.public["y"] = w.y
+            out.append(w.public)
+        return out
+
+    def _sync_positions(self):
+        """מעדכן את w.y מתוך מערך ה-SoA לפני שליחה ללקוחות"""
+        if np is None:
+            return
+        for w in self.words.values():
+            if w.slot >= 0:
+                w.y = float(self._y[w.slot])
+
+    def _alloc_slot(self, wid: str) -> int:
+        if not self._free_slots:
+            # הכפלת המערכים כשנגמרים slots פנויים
+            old = len(self._id_of_slot)
+            self._y = np.concatenate([self._y, np.zeros(old, np.float32)])
+            self._speed = np.concatenate([self._speed, np.zeros(old, np.float32)])
+            self._status = np.concatenate([self._status, np.zeros(old, np.int8)])
+            self._id_of_slot.extend([None] * old)
+            self._free_slots.extend(range(2 * old - 1, old - 1, -1))
+        slot = self._free_slots.pop()
+        self._id_of_slot[slot] = wid
+        return slot
 
     def _choose_unique_text(self) -> str:
-        # נסה למצוא מילה ייחודית שלא הופיעה עדיין
-        available_words = []
-        for word in self.words_list:
-            if word not in self.active_texts and word not in self.used_words:
-                available_words.append(word)
-        
-        if available_words:
-            return self.rng.choice(available_words)
-        
-        # אם נגמרו המילים הייחודיות, נחזיר מילה אקראית שלא פעילה כרגע
-        available_words = []
-        for word in self.words_list:
-            if word not in self.active_texts:
-                available_words.append(word)
-        
-        if available_words:
-            return self.rng.choice(available_words)
-        
+        # pop מרשימה מעורבבת במקום שתי סריקות של כל המאגר בכל ספאון
+        while self._available:
+            text = self._available.pop()
+            if text not in self.active_texts:
+                return text
+
+        # נגמרו המילים הייחודיות — ממחזרים את כל מה שלא פעיל כרגע
+        recycled = [w for w in self.words_list if w not in self.active_texts]
+        if recycled:
+            self.rng.shuffle(recycled)
+            self._available = recycled
+            return self._available.pop()
+
         # אם גם זה לא עובד, נחזיר מילה אקראית
         return self.rng.choice(self.words_list)
 
     def spawn_word(self) -> Word:
         text = self._choose_unique_text()
         # עכשיו text לא יכול להיות None כי _choose_unique_text תמיד מחזיר משהו
-        wid = f"w_{int(time.time()*1000)}_{self.rng.randrange(100000)}"#זה מבטיח שכל מילה תקבל מזהה שונה לגמרי
+        self._next_wid += 1
+        wid = f"w_{self._next_wid}"  # מונה רץ לכל חדר — מזהה ייחודי בלי קריאת שעון
         x = float(self.rng.randint(40, CANVAS_W-160))
         y = -40.0
         speed = WORD_SPEED_BASE + self.rng.random()*WORD_SPEED_RAND
         w = Word(id=wid, text=text, x=x, y=y, speed=speed, remaining=text)
+        if np is not None:
+            w.slot = self._alloc_slot(wid)
+            self._y[w.slot] = y
+            self._speed[w.slot] = speed
+            self._status[w.slot] = ST_FALLING
         self.words[wid] = w
         self.active_texts.add(text)
+        self.free_by_first.setdefault(text[0], set()).add(wid)
         return w
 
     def _despawn(self, wid: str):
         w = self.words.pop(wid, None)
-        if w: 
+        if w:
             self.active_texts.discard(w.text)
-            self.used_words.add(w.text)  # הוסף למילים שכבר הופיעו
+            ids = self.free_by_first.get(w.text[0])
+            if ids: ids.discard(wid)
+            if np is not None and w.slot >= 0:
+                self._status[w.slot] = ST_DEAD
+                self._id_of_slot[w.slot] = None
+                self._free_slots.append(w.slot)
+                w.slot = -1
 
     def tick(self):
         missed_now = []
-        for w in list(self.words.values()):
-            if w.status in ("completed","missed"): continue
-            w.y += w.speed
-            if w.y >= CANVAS_H - 120:
+        if np is not None:
+            # עדכון וקטורי: כל המילים החיות זזות בפעולה אחת
+            active = self._status > ST_DEAD
+            self._y[active] += self._speed[active]
+            missed = active & (self._y >= CANVAS_H - 120)
+            for i in np.flatnonzero(missed):
+                w = self.words[self._id_of_slot[i]]
+                w.y = float(self._y[i])
                 w.status = "missed"
                 missed_now.append(w.id)
-                # שחרר את המילה הנוכחית של השחקן אם זו המילה שלו
-                for p in self.players.values():
-                    if p.current_word_id == w.id:
-                        p.current_word_id = None
-                    p.lives = max(0, p.lives - MISS_LIFE_PENALTY)
-                    p.streak = 0
-        if missed_now:
-            socketio.emit("word_missed", {"wordIds": missed_now}, room=self.room_id)
-            for wid in missed_now: self._despawn(wid)
+                self._handle_miss(w)
+        else:
+            for w in list(self.words.values()):
+                if w.status in ("completed","missed"): continue
+                w.y += w.speed
+                if w.y >= CANVAS_H - 120:
+                    w.status = "missed"
+                    missed_now.append(w.id)
+                    self._handle_miss(w)
+        for wid in missed_now: self._despawn(wid)
+        return missed_now
+
+    def _handle_miss(self, w: Word):
+        # שחרר את המילה הנוכחית של השחקן אם זו המילה שלו
+        with self._player_lock:
+            for p in self.players.values():
+                if p.current_word_id == w.id:
+                    p.current_word_id = None
+                p.lives = max(0, p.lives - MISS_LIFE_PENALTY)
+                p.streak = 0
+            self._pub_dirty = True
 
     def type_char(self, sid: str, ch: str) -> dict:
-        with self.lock:
-            p = self.players.get(sid)
-            if not p or p.lives <= 0:
-                return {"type": "noop"}
+        p = self.players.get(sid)
+        if not p or p.lives <= 0:
+            return {"type": "noop"}
 
-            ch = ch.lower()
-            if len(ch) != 1 or ch not in string.ascii_lowercase:
-                return {"type": "noop"}
+        ch = ch.lower()
+        # השוואת טווח ישירה במקום סריקת המחרוזת ascii_lowercase
+        if len(ch) != 1 or not ("a" <= ch <= "z"):
+            return {"type": "noop"}
 
+        completed = False
+        with self._word_lock:
             # אם יש מילה נעולה לשחקן הזה - המשך רק אותה
             if p.current_word_id and p.current_word_id in self.words:
                 w = self.words[p.current_word_id]
                 if w.owner_sid == sid and w.remaining and w.remaining[0] == ch:
+                    w.version += 1  # מסמן לקוראים שכתיבה באמצע
                     w.typed += ch
                     w.remaining = w.remaining[1:]
-                    p.score += SCORE_PER_CHAR
-                    p.streak += 1
-
+                    w.dirty = True
                     if not w.remaining:
                         w.status = "completed"
-                        p.score += WORD_BONUS
+                        completed = True
                         self._despawn(w.id)
                         p.current_word_id = None  # אפס את המילה הנוכחית
-                        return {"type": "completed", "word": w.to_public(self.players),
-                                "players": self.public_players(), "completed_by": sid}
-
-                    return {"type": "progress", "word": w.to_public(self.players),
-                            "players": self.public_players()}
+                    w.version += 1
                 else:
                     # אם האות לא מתאימה למילה הנוכחית - זה שגיאה
-                    p.streak = 0
+                    with self._player_lock:
+                        p.streak = 0
                     return {"type": "bad_key"}
-
-            # חיפוש מילה חופשית שמתחילה באות זו - רק אם אין מילה נוכחית
-            for w in self.words.values():
-                if w.status == "falling" and not w.owner_sid and w.remaining.startswith(ch):
+            else:
+                # חיפוש מילה חופשית שמתחילה באות זו - רק אם אין מילה נוכחית
+                # אינדקס לפי אות ראשונה במקום סריקה של כל המילים בכל הקשה
+                ids = self.free_by_first.get(ch)
+                if ids:
+                    wid = next(iter(ids))
+                    w = self.words[wid]
+                    ids.discard(wid)  # המילה ננעלה — כבר לא חופשית
+                    w.version += 1
                     w.owner_sid = sid
                     p.current_word_id = w.id
                     w.status = "locked"
+                    if np is not None and w.slot >= 0:
+                        self._status[w.slot] = ST_LOCKED
                     w.typed = ch
                     w.remaining = w.remaining[1:]
-                    p.score += SCORE_PER_CHAR
-                    p.streak += 1
-                    return {"type": "progress", "word": w.to_public(self.players),
-                            "players": self.public_players()}
-
-            # אם אין התאמה
-            p.streak = 0
-            return {"type": "bad_key"}
-
-
+                    w.dirty = True
+                    w.version += 1
+                else:
+                    # אם אין התאמה
+                    with self._player_lock:
+                        p.streak = 0
+                    return {"type": "bad_key"}
+            word_public = w.to_public(self._color_of_sid)
+
+        # עדכון ניקוד תחת נעילת השחקנים בלבד — הטיק יכול להמשיך במקביל
+        with self._player_lock:
+            p.score += SCORE_PER_CHAR
+            p.streak += 1
+            if completed:
+                p.score += WORD_BONUS
+            self._pub_dirty = True
+            players_public = self.public_players()
+
+        if completed:
+            return {"type": "completed", "word": word_public,
+                    "players": players_public, "completed_by": sid}
+        return {"type": "progress", "word": word_public, "players": players_public}
+
+
+
+    def _read_word_delta(self, w: Word) -> Optional[dict]:
+        """קריאה עקבית של מילה בלי נעילה, בסגנון seqlock.
+
+        מונה אי-זוגי אומר ש-type_char באמצע כתיבה; מונה שהשתנה בין תחילת
+        הקריאה לסופה אומר שקראנו מצב חצוי — בשני המקרים מנסים שוב. תחת
+        ה-GIL החזרות נדירות, אבל זה מאפשר לבנות את הדלתא בלי _word_lock.
+        """
+        while True:
+            v1 = w.version
+            if v1 & 1:
+                continue
+            if w.id not in self.words:
+                return None  # הושלמה/נפסלה בינתיים — הלקוח יקבל word_completed
+            if w.dirty or w.public is None:
+                d = w.to_public(self._color_of_sid)
+            else:
+                w.public["y"] = w.y
+                d = {"id": w.id, "y": w.y}
+            if w.version == v1:
+                w.dirty = False
+                return d
 
     def _all_ready(self):
         """בודק אם שני השחקנים סימנו ready"""
@@ -276,17 +435,17 @@ class Game:
         self.running = True
         interval = 1.0 / TICK_HZ #אומר כל כמה שניות מתבצע “טיק” (כלומר עידכון מצב).
         duration = 300  # 5 דקות
-        start_time = time.time()
+        start_time = time.monotonic()
 
         try:
-            # מחכים לשני השחקנים
+            # מחכים לשני השחקנים — socketio.sleep מפנה את ה-worker ללקוחות אחרים
             while self.running and not self._all_ready():
-                time.sleep(0.05)
+                socketio.sleep(0.05)
 
             # ספירה לאחור
             for c in [3, 2, 1]:
                 socketio.emit("countdown", {"count": c}, room=self.room_id)
-                time.sleep(1)
+                socketio.sleep(1)
 
             socketio.emit("game_start", {
                 "players": self.public_players(),
@@ -295,52 +454,64 @@ class Game:
 
             # לולאת המשחק
             while self.running and len(self.players) == 2:
-                t0 = time.time()
+                # קריאת שעון אחת לטיק — משמשת לכל הבדיקות בהמשך
+                now = time.monotonic()
 
                 # בדיקה אם עבר הזמן
-                if time.time() - start_time >= duration:
+                if now - start_time >= duration:
                     self.running = False
                     break
 
-                with self.lock:
-                    now = time.time()
+                with self._word_lock:
+                    spawned = []
                     if now >= self.next_spawn_time:
                         nw = self.spawn_word()  # עכשיו זה תמיד מחזיר מילה
-                        socketio.emit("word_spawn", {"words": [nw.to_public(self.players)]}, room=self.room_id)
+                        spawned.append(nw.to_public(self._color_of_sid))
                         self.next_spawn_time = now + self.rng.uniform(SPAWN_EVERY_MIN, SPAWN_EVERY_MAX)
 
-                    self.tick()
-                    # שלח עדכון לכל שחקן בנפרד עם המידע הנכון שלו
-                    for sid in self.players.keys():
-                        socketio.emit("update_state", {
-                            "players": {sid: self.public_players()[sid]},
-                            "words": self.snapshot(),
-                            "time_left": max(0, int(duration - (time.time() - start_time)))
-                        }, room=sid)
+                    missed_ids = self.tick()
+                    self._sync_positions()
+                    live = list(self.words.values())
+
+                # דלתא בלי נעילה: הלולאה היא הכותבת היחידה של מיקומים,
+                # ושינויי type_char נתפסים דרך מוני ה-version של המילים
+                delta = []
+                for w in live:
+                    d = self._read_word_delta(w)
+                    if d is not None:
+                        delta.append(d)
 
+                with self._player_lock:
+                    players_pub = self.public_players()
                     if all(p.lives <= 0 for p in self.players.values()):
                         self.running = False
 
-                dt = time.time() - t0
+                # השליחה מחוץ לנעילות — הקלדות לא נחסמות בזמן הסריאליזציה
+                socketio.emit("tick", {
+                    "spawned": spawned,
+                    "missed_ids": missed_ids,
+                    "state_delta": delta,
+                    "players": players_pub,
+                    "time_left": max(0, int(duration - (now - start_time)))
+                }, room=self.room_id)
+
+                dt = time.monotonic() - now
                 if dt < interval:
-                    time.sleep(interval - dt)#שומר שהלולאה תרוץ בדיוק 30 פעמים בשנייה
+                    socketio.sleep(interval - dt)#שומר שהלולאה תרוץ בדיוק 30 פעמים בשנייה
 
         finally:
             # סיום והכרזת מנצח
             scores = [(p.username, p.score) for p in self.players.values()]
             scores.sort(key=lambda x: x[1], reverse=True)
             winner = scores[0] if scores else ("Nobody", 0)
-            # שלח עדכון לכל שחקן בנפרד עם המידע הנכון שלו
-            for sid in self.players.keys():
-                socketio.emit("game_over", {
-                    "players": {sid: self.public_players()[sid]},
-                    "winner": winner[0],
-                    "score": winner[1]
-                }, room=sid)
+            socketio.emit("game_over", {
+                "players": self.public_players(),
+                "winner": winner[0],
+                "score": winner[1]
+            }, room=self.room_id)
 
 # ====== תור שחקנים ======
 WAITING, WAITING_SIDS, ROOM_BY_SID, GAMES = [], set(), {}, {}
-PLAYER_COLORS = [(255,120,120),(120,120,255)]
 
 def _pair_if_possible():
     while len(WAITING)>=2:
@@ -352,9 +523,41 @@ def _pair_if_possible():
         game=Game(room,WORD_BANK)
         game.players[sid1]=Player(sid1,u1,PLAYER_COLORS[0])
         game.players[sid2]=Player(sid2,u2,PLAYER_COLORS[1])
+        game._color_of_sid={sid:p.color for sid,p in game.players.items()}
         GAMES[room]=game
         socketio.emit("game_found",{"room":room,"players":{sid1:u1,sid2:u2}},room=room)#נשלחת הודעה ללקוחות (הדפדפנים) ששני שחקנים נמצאו ושיש חדר חדש.
-        threading.Thread(target=game.loop,daemon=True).start()#נפתח Thread חדש שמריץ את game.loop() ברקע.
+        # משימת רקע של socketio (greenlet תחת eventlet, thread במצב רגיל) במקום Thread לכל חדר
+        socketio.start_background_task(game.loop)
+
+# ====== משתמשים ======
+USERS_PATH = "users.json"
+# מטמון בזיכרון — קוראים מהדיסק רק כשהקובץ באמת השתנה (לפי mtime)
+_USERS_CACHE = {"mtime": None, "data": {}}
+
+def _load_users() -> dict:
+    try:
+        mtime = os.stat(USERS_PATH).st_mtime
+    except OSError:
+        _USERS_CACHE["mtime"] = None
+        _USERS_CACHE["data"] = {}
+        return {}
+    if mtime != _USERS_CACHE["mtime"]:
+        try:
+            with open(USERS_PATH, "r") as f:
+                _USERS_CACHE["data"] = json.load(f)
+        except Exception:
+            _USERS_CACHE["data"] = {}
+        _USERS_CACHE["mtime"] = mtime
+    return _USERS_CACHE["data"]
+
+def _save_users(users: dict):
+    with open(USERS_PATH, "w") as f:
+        json.dump(users, f, indent=2)
+    try:
+        _USERS_CACHE["mtime"] = os.stat(USERS_PATH).st_mtime
+    except OSError:
+        _USERS_CACHE["mtime"] = None
+    _USERS_CACHE["data"] = users
 
 # ====== ROUTES ======
 @app.route('/')
@@ -383,8 +586,8 @@ def api_signin():
     data=request.get_json() or {}#שולף את הנתונים שנשלחו ב־POST (בפורמט JSON).
     user=data.get("username","").strip()
     pw=data.get("password","").strip()
-    if not os.path.exists("users.json"): return jsonify({"ok":False,"msg":"No users"}),400
-    users=json.load(open("users.json","r"))
+    if not os.path.exists(USERS_PATH): return jsonify({"ok":False,"msg":"No users"}),400
+    users=_load_users()
     if user not in users or users[user]!=pw:
         return jsonify({"ok":False,"msg":"Invalid credentials"}),400
     session["user"]=user#כאן Flask שומר “Session Cookie” בדפדפן של המשתמש.
@@ -403,24 +606,18 @@ def api_signup():
         return jsonify({"ok":False,"msg":"Password must be at least 6 characters"}),400
     
     # Load existing users
-    users = {}
-    if os.path.exists("users.json"):
-        try:
-            users = json.load(open("users.json","r"))
-        except:
-            users = {}
-    
+    users = _load_users()
+
     # Check if user already exists
     if email in users:
         return jsonify({"ok":False,"msg":"Email already registered"}),400
-    
+
     # Create new user
     users[email] = password
-    
-    # Save users
-    with open("users.json","w") as f:
-        json.dump(users, f, indent=2)
-    
+
+    # Save users (מעדכן גם את המטמון)
+    _save_users(users)
+
     return jsonify({"ok":True,"msg":"Account created successfully!"})
 
 # ====== SOCKET.IO ======
@@ -446,7 +643,7 @@ def on_client_ready():
     if not room:return
     g=GAMES.get(room)
     if not g:return
-    with g.lock:
+    with g._player_lock:
         if sid in g.players:
             g.players[sid].ready=True
             print(f"[READY] {g.players[sid].username} marked ready")
@@ -461,14 +658,11 @@ def on_typed_character(data):
     if not g:return
     result=g.type_char(sid,ch)
     if result["type"]=="progress":
-        # שלח עדכון לכל שחקן בנפרד עם המידע הנכון שלו
-        for player_sid in g.players.keys():
-            socketio.emit("word_update",{"word":result["word"],"players":{player_sid: g.public_players()[player_sid]}},room=player_sid)
+        # הודעה אחת לחדר עם שתי הרשומות — הלקוח בוחר את שלו
+        socketio.emit("word_update",{"word":result["word"],"players":result["players"]},room=room)
     elif result["type"]=="completed":
-        # שלח עדכון לכל שחקן בנפרד עם המידע הנכון שלו
-        for player_sid in g.players.keys():
-            socketio.emit("word_completed",{"word":result["word"],"completed_by":result["completed_by"],
-                                            "players":{player_sid: g.public_players()[player_sid]}},room=player_sid)
+        socketio.emit("word_completed",{"word":result["word"],"completed_by":result["completed_by"],
+                                        "players":result["players"]},room=room)
         try:
             g._despawn(result["word"]["id"])
         except Exception as e: